@@ -1,34 +1,64 @@
 from ctypes import Union
 from typing import Any, Dict, List, Optional, Tuple, Union
 from copy import copy
-import datetime
+import contextlib
+import csv
 import json
+import os
 import logging
 
 import bson
+from bson import json_util
 import pymongo
 
 from mongeasy.exceptions import MongEasyDBCollectionError, MongEasyDBDocumentError, MongEasyFieldError
 from mongeasy.models.resultlist import ResultList
+from mongeasy.tools.columnar import ColumnBuilder, batched, get_field, serialize_value, set_field
 from mongeasy.tools.naming import pascal_to_snake
 
 
 logger = logging.getLogger(__name__)
 
+
+@contextlib.contextmanager
+def _open_export(path: str, **kwargs):
+    """
+    Open a file for an export, removing the partly written file if the export fails.
+    """
+    f = open(path, 'w', encoding='utf-8', **kwargs)
+    try:
+        with f:
+            yield f
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        raise
+
+
 class _DocumentBase:
     """
     Base class for all document classes.
     """
     collection = None
-    def __init__(self, *args, **kwargs):
+
+    @classmethod
+    def _connect_collection(cls):
         """
-        Initialize the document object.
+        Create the collection object for this class if it does not have one.
         """
-        if self.__class__.collection is None:
+        if cls.collection is None:
             from mongeasy import connection
+            if connection is None:
+                return
             # Create the collection object
-            collection_name = pascal_to_snake(self.__class__.__name__) + 's'            
-            self.__class__.collection = connection[collection_name]
+            collection_name = pascal_to_snake(cls.__name__) + 's'
+            cls.collection = connection[collection_name]
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the document object.
+        """
+        self.__class__._connect_collection()
 
         # Handle positional arguments
         if len(args) == 1 and isinstance(args[0], dict):
@@ -176,15 +206,7 @@ class _DocumentBase:
         """
         Convert the document to a dictionary.
         """
-        _dict = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, bson.ObjectId):
-                _dict[key] = str(value)
-            elif isinstance(value, datetime.datetime):
-                _dict[key] = value.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-            else:
-                _dict[key] = value
-        return _dict
+        return {key: serialize_value(value) for key, value in self.__dict__.items()}
     
     @classmethod
     def find_raw(cls, filter_: Dict = None, projection: Union[List, Dict] = None, **kwargs) -> pymongo.cursor.Cursor:
@@ -278,18 +300,226 @@ class _DocumentBase:
         cls.collection.delete_many(filter_dict)
     
     @classmethod
-    def insert_many(cls, documents: List[Dict]):
+    def insert_many(cls, documents: List[Union[Dict, '_DocumentBase']], batch_size: int = 1000) -> int:
         """
         Insert many documents.
+        As with save(), a document with an _id updates the fields of the stored document with that _id,
+        it is inserted if no such document exists. Documents that cannot be written, such as documents
+        with an invalid _id, are logged and skipped.
         
-        :param documents: A list of documents.
+        :param documents: A list or other iterable of dicts or document objects.
+        :param batch_size: The number of documents sent to the database in each write.
+        :return: The number of inserted or updated documents.
         """
-        for item in documents:
+        cls._connect_collection()
+        if cls.collection is None:
+            logger.error("The collection does not exist")
+            raise MongEasyDBCollectionError('The collection does not exist')
+
+        written = 0
+        for batch in batched(documents, batch_size):
+            docs = []
+            for item in batch:
+                try:
+                    docs.append(cls._prepare_insert(item))
+                except MongEasyFieldError as e:
+                    logger.error(f"Error inserting item: {item}. Exception: {e}")
+
+            # Documents whose _id is already stored are updated, the rest are inserted in one batch
+            ids = [doc['_id'] for doc in docs if '_id' in doc]
+            existing = {doc['_id'] for doc in cls.collection.find({'_id': {'$in': ids}}, {'_id': 1})} if ids else set()
+            new_docs = []
+            for doc in docs:
+                if doc.get('_id') not in existing:
+                    new_docs.append(doc)
+                    continue
+                fields = {key: value for key, value in doc.items() if key != '_id'}
+                if not fields:
+                    continue
+                try:
+                    written += cls.collection.update_one({'_id': doc['_id']}, {'$set': fields}).matched_count
+                except pymongo.errors.WriteError as e:
+                    logger.error(f"Error inserting item: {doc}. Exception: {e}")
+            if not new_docs:
+                continue
             try:
-                cls(item).save()
-            except pymongo.errors.WriteError as e:
-                _DocumentBase.logger.exception(f"Error inserting item: {item}. Exception: {e}")
-        
+                written += len(cls.collection.insert_many(new_docs, ordered=False).inserted_ids)
+            except pymongo.errors.BulkWriteError as e:
+                written += e.details.get('nInserted', 0)
+                for error in e.details.get('writeErrors', []):
+                    logger.error(f"Error inserting item: {error.get('op')}. Exception: {error.get('errmsg')}")
+        return written
+
+    @classmethod
+    def _prepare_insert(cls, item: Union[Dict, '_DocumentBase']) -> Dict:
+        """
+        Copy a raw document or the fields of a document object and convert its _id to an ObjectId,
+        as done when creating a document.
+        """
+        doc = copy(item.__dict__ if isinstance(item, _DocumentBase) else item)
+        if doc.get('_id') is None:
+            doc.pop('_id', None)
+        else:
+            try:
+                doc['_id'] = bson.ObjectId(str(doc['_id']))
+            except bson.errors.InvalidId:
+                raise MongEasyFieldError(f'Invalid _id: {doc["_id"]}')
+        return doc
+
+    @staticmethod
+    def _raw_filter(filter_dict: Dict = None) -> Dict:
+        """
+        Copy a filter with a string _id converted to an ObjectId.
+        """
+        filter_dict = dict(filter_dict or {})
+        if isinstance(filter_dict.get('_id'), str):
+            filter_dict['_id'] = bson.ObjectId(filter_dict['_id'])
+        return filter_dict
+
+    @classmethod
+    def _find_batches(cls, filter_dict: Dict = None, projection: Union[List, Dict] = None, batch_size: int = 1000, **kwargs):
+        """
+        Iterate over raw documents in lists of at most batch_size documents without creating document objects.
+        """
+        cursor = cls.find_raw(cls._raw_filter(filter_dict), projection, batch_size=batch_size, **kwargs)
+        return batched(cursor, batch_size)
+
+    @classmethod
+    def to_columns(cls,
+                   fields: List[str],
+                   dtypes: Dict[str, Any] = None,
+                   filter_dict: Dict = None,
+                   sort: Optional[Union[Tuple[str, int], List[Tuple[str, int]]]] = None,
+                   limit: int = 0,
+                   skip: int = 0,
+                   backend: str = 'numpy',
+                   batch_size: int = 1000
+        ) -> Dict[str, Any]:
+        """
+        Read matching documents into one typed array per field.
+        Cursor batches are written directly to the arrays, no document objects are created.
+        Without dtypes the type of each field is inferred from its values, ints become floats
+        if the field also holds floats or is missing in some documents.
+
+        :param fields: The fields to read, dotted paths are allowed.
+        :param dtypes: Optional dict mapping fields to a NumPy dtype or an Arrow DataType.
+        :param filter_dict: A dictionary of filters.
+        :param sort: The sort to use.
+        :param limit: The maximum number of documents to read.
+        :param skip: The number of documents to skip.
+        :param backend: 'numpy' for numpy.ndarray columns or 'arrow' for pyarrow.ChunkedArray columns.
+        :param batch_size: The number of documents converted at a time.
+        :return: A dict mapping each field to its array.
+        """
+        size_hint = 0
+        if backend == 'numpy':
+            # Count first so the NumPy columns can be allocated once
+            count_kwargs = {'limit': limit} if limit else {}
+            size_hint = cls.collection.count_documents(cls._raw_filter(filter_dict), skip=skip, **count_kwargs)
+        builder = ColumnBuilder(fields, dtypes, backend, size_hint)
+        projection = {field.split('.')[0]: 1 for field in fields}
+        if '_id' not in projection:
+            projection['_id'] = 0
+        for batch in cls._find_batches(filter_dict, projection, batch_size, sort=sort, limit=limit, skip=skip):
+            builder.add_batch(batch)
+        return builder.build()
+
+    @classmethod
+    def export_ndjson(cls, path: str, filter_dict: Dict = None, projection: Union[List, Dict] = None, batch_size: int = 1000) -> int:
+        """
+        Write matching documents to a file with one canonical Extended JSON document per line,
+        so BSON types such as Int64 and datetimes are kept when the file is read by import_ndjson().
+
+        :param path: The file to write.
+        :param filter_dict: A dictionary of filters, all documents are exported if None.
+        :param projection: The projection to use.
+        :param batch_size: The number of documents fetched from the database at a time.
+        :return: The number of exported documents.
+        """
+        count = 0
+        with _open_export(path) as f:
+            for batch in cls._find_batches(filter_dict, projection, batch_size):
+                f.writelines(json_util.dumps(doc, json_options=json_util.CANONICAL_JSON_OPTIONS) + '\n' for doc in batch)
+                count += len(batch)
+        return count
+
+    @classmethod
+    def export_csv(cls, path: str, fields: List[str], filter_dict: Dict = None, batch_size: int = 1000) -> int:
+        """
+        Write matching documents to a CSV file with one column per field.
+        Values are converted the same way as in to_dict(), missing values are written as
+        empty strings and lists or dicts as relaxed Extended JSON.
+
+        :param path: The file to write.
+        :param fields: The fields to export, dotted paths are allowed.
+        :param filter_dict: A dictionary of filters, all documents are exported if None.
+        :param batch_size: The number of documents fetched from the database at a time.
+        :return: The number of exported documents.
+        """
+        projection = {field.split('.')[0]: 1 for field in fields}
+        if '_id' not in projection:
+            projection['_id'] = 0
+        count = 0
+        with _open_export(path, newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            for batch in cls._find_batches(filter_dict, projection, batch_size):
+                for doc in batch:
+                    row = []
+                    for field in fields:
+                        value = get_field(doc, field)
+                        if value is None:
+                            value = ''
+                        elif isinstance(value, (dict, list)):
+                            value = json_util.dumps(value, json_options=json_util.RELAXED_JSON_OPTIONS)
+                        else:
+                            value = serialize_value(value)
+                        row.append(value)
+                    writer.writerow(row)
+                count += len(batch)
+        return count
+
+    @classmethod
+    def import_ndjson(cls, path: str, batch_size: int = 1000) -> int:
+        """
+        Insert documents from a file with one Extended JSON document per line, such as one written by export_ndjson().
+
+        :param path: The file to read.
+        :param batch_size: The number of documents sent to the database in each insert.
+        :return: The number of inserted or updated documents.
+        """
+        with open(path, encoding='utf-8') as f:
+            return cls.insert_many((json_util.loads(line) for line in f if line.strip()), batch_size)
+
+    @classmethod
+    def import_csv(cls, path: str, converters: Dict[str, Any] = None, batch_size: int = 1000) -> int:
+        """
+        Insert documents from a CSV file with a header row, such as one written by export_csv().
+        Empty values are left out and dotted column names are stored as nested fields.
+        Values are inserted as strings unless a converter is given for the column, use
+        bson.json_util.loads for list or dict columns written by export_csv().
+
+        :param path: The file to read.
+        :param converters: Optional dict mapping columns to a function converting the string value.
+        :param batch_size: The number of documents sent to the database in each insert.
+        :return: The number of inserted or updated documents.
+        """
+        if converters is None:
+            converters = {}
+
+        def rows(reader):
+            for row in reader:
+                doc = {}
+                for field, value in row.items():
+                    if value == '' or value is None:
+                        continue
+                    if field in converters:
+                        value = converters[field](value)
+                    set_field(doc, field, value)
+                yield doc
+
+        with open(path, encoding='utf-8', newline='') as f:
+            return cls.insert_many(rows(csv.DictReader(f)), batch_size)
     
     @classmethod
     def document_count(cls, filter_dict=None) -> int:
@@ -1,6 +1,8 @@
 import functools
 import random
 
+from mongeasy.tools.columnar import ColumnBuilder, batched
+
 
 class ResultList(list):
     """
@@ -104,4 +106,27 @@ class ResultList(list):
         Return a random element from the list
         :return: A random element from the list
         """
-        return random.choice(self)
\ No newline at end of file
+        return random.choice(self)
+
+    def to_columns(self, fields, dtypes=None, backend='numpy', batch_size=1000):
+        """
+        Collect the given fields of all elements into one typed array per field
+        To read query results without creating documents, use Document.to_columns instead
+        :param fields: A list of fields to collect, dotted paths are allowed
+        :param dtypes: An optional dict mapping fields to a NumPy dtype or an Arrow DataType
+        :param backend: 'numpy' for numpy.ndarray columns or 'arrow' for pyarrow.ChunkedArray columns
+        :param batch_size: The number of elements converted at a time
+        :return: A dict mapping each field to its array
+        """
+        builder = ColumnBuilder(fields, dtypes, backend, len(self))
+        for batch in batched(self, batch_size):
+            docs = []
+            for item in batch:
+                if isinstance(item, dict):
+                    docs.append(item)
+                elif hasattr(item, '__dict__'):
+                    docs.append(vars(item))
+                else:
+                    raise TypeError(f'to_columns() needs dicts or documents, got {type(item).__name__}')
+            builder.add_batch(docs)
+        return builder.build()
\ No newline at end of file
@@ -0,0 +1,313 @@
+import datetime
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import bson
+
+from mongeasy.exceptions import MongEasyFieldError
+
+_MISSING = object()
+
+BACKENDS = ('numpy', 'arrow')
+
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+
+def get_field(doc: Dict, path: str, default: Any = None) -> Any:
+    """
+    Get a value from a raw document using a dotted path.
+
+    Example:
+    get_field({'address': {'city': 'Anytown'}}, 'address.city') -> 'Anytown'
+    """
+    value = doc
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return default
+        value = value.get(part, _MISSING)
+        if value is _MISSING:
+            return default
+    return value
+
+
+def set_field(doc: Dict, path: str, value: Any):
+    """
+    Set a value in a raw document using a dotted path, creating nested dicts as needed.
+
+    Example:
+    doc = {}
+    set_field(doc, 'address.city', 'Anytown')
+    doc -> {'address': {'city': 'Anytown'}}
+    """
+    *parents, last = path.split('.')
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+
+def serialize_value(value: Any) -> Any:
+    """
+    Convert a single value to the form used by Document.to_dict().
+    ObjectIds become strings and datetimes become strings in DATETIME_FORMAT.
+    """
+    if isinstance(value, bson.ObjectId):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return value.strftime(DATETIME_FORMAT)
+    return value
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most size elements.
+    """
+    if size < 1:
+        raise ValueError(f'batch size must be at least 1, got {size}')
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _import_backend(backend: str):
+    """
+    Import the array library for a backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown backend {backend!r}, expected one of {", ".join(BACKENDS)}')
+    try:
+        if backend == 'numpy':
+            import numpy
+            return numpy
+        import pyarrow
+        return pyarrow
+    except ImportError as e:
+        package = 'numpy' if backend == 'numpy' else 'pyarrow'
+        raise ImportError(f"The '{backend}' backend requires the {package} package") from e
+
+
+def _column_value(value: Any) -> Any:
+    """
+    Convert a raw value, and any values nested in dicts or lists, for storage in a column.
+    ObjectIds and BSON types without a matching array type become strings, Decimal128
+    becomes decimal.Decimal. Datetimes are kept so they stay typed in the column.
+    """
+    if isinstance(value, dict):
+        return {k: _column_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_column_value(v) for v in value]
+    if isinstance(value, bson.Decimal128):
+        return value.to_decimal()
+    if isinstance(value, (bson.ObjectId, bson.Regex, bson.Timestamp, bson.DBRef, bson.MinKey, bson.MaxKey)):
+        return str(value)
+    return value
+
+
+def _value_kind(value: Any) -> str:
+    """
+    Get the kind of a non-missing value, used to infer the dtype of a NumPy column.
+    """
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        return 'str'
+    if isinstance(value, datetime.datetime):
+        return 'datetime'
+    if isinstance(value, (dict, list)):
+        return 'object'
+    return type(value).__name__
+
+
+class _NumpyColumn:
+    """
+    A NumPy column written batch by batch into one preallocated array.
+    Without an explicit dtype the dtype is inferred from the values seen so far:
+    bools, ints (floats if values are missing), floats, datetimes (datetime64[ms])
+    and strings, lists or dicts (object). ints are widened to floats when floats or
+    missing values are found later and strings may be mixed with lists or dicts,
+    any other mix of kinds is an error.
+    """
+    _KIND_DTYPES = {'bool': 'bool', 'int': 'int64', 'float': 'float64', 'datetime': 'datetime64[ms]',
+                    'str': 'object', 'object': 'object'}
+
+    def __init__(self, np, field: str, dtype: Any = None, size_hint: int = 0):
+        self.np = np
+        self.field = field
+        self.explicit = dtype is not None
+        self.kind = None
+        self.has_missing = False
+        self.length = 0
+        self.data = None
+        if self.explicit:
+            self.data = np.empty(size_hint, dtype=np.dtype(dtype))
+        self.size_hint = size_hint
+
+    def _error(self, message: str) -> MongEasyFieldError:
+        return MongEasyFieldError(f"Could not convert field '{self.field}': {message}")
+
+    def _inferred_dtype(self):
+        dtype = self._KIND_DTYPES[self.kind]
+        if self.has_missing and self.kind == 'int':
+            dtype = 'float64'
+        elif self.has_missing and self.kind == 'bool':
+            dtype = 'object'
+        return self.np.dtype(dtype)
+
+    def _missing(self):
+        kind = self.data.dtype.kind
+        if kind == 'f':
+            return self.np.nan
+        if kind == 'M':
+            return self.np.datetime64('NaT')
+        return None
+
+    def _reserve(self, count: int):
+        needed = self.length + count
+        if needed > len(self.data):
+            self.data.resize(max(needed, 2 * len(self.data)), refcheck=False)
+
+    def _infer(self, values: List):
+        kinds = {_value_kind(value) for value in values if value is not None}
+        self.has_missing = self.has_missing or None in values
+        if self.kind is not None:
+            kinds.add(self.kind)
+        if kinds == {'int', 'float'}:
+            kinds = {'float'}
+        elif kinds == {'str', 'object'}:
+            kinds = {'object'}
+        if len(kinds) > 1:
+            raise self._error(f"mixed value types {', '.join(sorted(kinds))}, pass a dtype such as object")
+        if not kinds:
+            return
+        self.kind = kinds.pop()
+        if self.kind not in self._KIND_DTYPES:
+            raise self._error(f'unsupported value type {self.kind}, pass a dtype such as object')
+
+        dtype = self._inferred_dtype()
+        if self.data is None:
+            # Fill the values that were all missing before the first value was found
+            self.data = self.np.empty(max(self.size_hint, self.length), dtype=dtype)
+            if self.length:
+                self.data[:self.length] = self._missing()
+        elif self.data.dtype != dtype:
+            self.data = self.data.astype(dtype)
+
+    def _check_explicit(self, values: List):
+        kind = self.data.dtype.kind
+        if kind in 'iubUS' and None in values:
+            raise self._error(f'missing values cannot be stored as {self.data.dtype}')
+        if kind in 'iu':
+            for value in values:
+                if isinstance(value, float) and not value.is_integer():
+                    raise self._error(f'{value} cannot be stored as {self.data.dtype} without losing data')
+
+    def add(self, values: List):
+        if self.explicit:
+            self._check_explicit(values)
+        else:
+            self._infer(values)
+            if self.data is None:
+                self.length += len(values)
+                return
+        self._reserve(len(values))
+        start = self.length
+        try:
+            if self.data.dtype.kind == 'O':
+                # Assign one at a time so list values are stored as objects
+                for i, value in enumerate(values, start):
+                    self.data[i] = value
+            else:
+                missing = self._missing()
+                self.data[start:start + len(values)] = [missing if value is None else value for value in values]
+        except (TypeError, ValueError, OverflowError) as e:
+            raise self._error(str(e)) from e
+        self.length += len(values)
+
+    def build(self):
+        if self.data is None:
+            # Only missing values, or no values at all
+            return self.np.full(self.length, None, dtype=object)
+        self.data.resize(self.length, refcheck=False)
+        return self.data
+
+
+class _ArrowColumn:
+    """
+    An Arrow column made of one chunk per batch.
+    Without an explicit type each chunk is inferred separately and the chunks are
+    cast to a common type when the column is built, so ints and floats become doubles.
+    """
+    def __init__(self, pa, field: str, dtype: Any = None):
+        self.pa = pa
+        self.field = field
+        self.dtype = dtype
+        self.chunks = []
+
+    def _error(self, e: Exception) -> MongEasyFieldError:
+        return MongEasyFieldError(f"Could not convert field '{self.field}': {e}")
+
+    def add(self, values: List):
+        try:
+            self.chunks.append(self.pa.array(values, type=self.dtype))
+        except (TypeError, ValueError, OverflowError, self.pa.ArrowException) as e:
+            raise self._error(e) from e
+
+    def build(self):
+        if not self.chunks:
+            return self.pa.chunked_array([], type=self.dtype or self.pa.null())
+        if self.dtype is not None:
+            return self.pa.chunked_array(self.chunks, type=self.dtype)
+        try:
+            schema = self.pa.unify_schemas([self.pa.schema([('value', chunk.type)]) for chunk in self.chunks],
+                                           promote_options='permissive')
+            dtype = schema.field('value').type
+            return self.pa.chunked_array([chunk.cast(dtype) for chunk in self.chunks], type=dtype)
+        except (TypeError, ValueError, self.pa.ArrowException) as e:
+            raise self._error(e) from e
+
+
+class ColumnBuilder:
+    """
+    Collects raw documents batch by batch into typed columns.
+    Each batch is written to the columns as soon as it is added, so only one batch
+    of Python values is held in memory at a time.
+    """
+    def __init__(self, fields: List[str], dtypes: Optional[Dict[str, Any]] = None, backend: str = 'numpy',
+                 size_hint: int = 0):
+        """
+        :param fields: The fields to collect, dotted paths are allowed
+        :param dtypes: Optional dict mapping fields to a NumPy dtype or an Arrow DataType,
+            fields without a dtype are inferred from their values
+        :param backend: 'numpy' or 'arrow'
+        :param size_hint: The expected number of documents, used to preallocate NumPy columns
+        """
+        if not fields:
+            raise MongEasyFieldError('At least one field is required to build columns')
+        dtypes = dtypes or {}
+        unknown = set(dtypes) - set(fields)
+        if unknown:
+            raise MongEasyFieldError(f'dtypes given for fields not in fields: {", ".join(sorted(unknown))}')
+        lib = _import_backend(backend)
+        if backend == 'numpy':
+            self._columns = {field: _NumpyColumn(lib, field, dtypes.get(field), size_hint) for field in fields}
+        else:
+            self._columns = {field: _ArrowColumn(lib, field, dtypes.get(field)) for field in fields}
+
+    def add_batch(self, docs: List[Dict]):
+        """
+        Write a batch of raw documents to the columns.
+        :param docs: A list of raw documents
+        :return: None
+        """
+        for field, column in self._columns.items():
+            column.add([_column_value(get_field(doc, field)) for doc in docs])
+
+    def build(self) -> Dict[str, Any]:
+        """
+        Finish the columns.
+        :return: dict, field name to numpy.ndarray or pyarrow.ChunkedArray
+        """
+        return {field: column.build() for field, column in self._columns.items()}
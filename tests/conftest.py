@@ -0,0 +1,24 @@
+import pytest
+
+mongomock = pytest.importorskip('mongomock')
+
+from mongeasy import create_document_class
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()['mongeasy_test']
+
+
+@pytest.fixture
+def user_class(db):
+    User = create_document_class('User', 'users')
+    User.collection = db['users']
+    return User
+
+
+@pytest.fixture
+def copy_class(db):
+    Copy = create_document_class('Copy', 'copies')
+    Copy.collection = db['copies']
+    return Copy
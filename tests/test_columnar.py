@@ -0,0 +1,173 @@
+import datetime
+
+import bson
+import pytest
+
+from mongeasy.exceptions import MongEasyFieldError
+from mongeasy.models.resultlist import ResultList
+
+np = pytest.importorskip('numpy')
+pa = pytest.importorskip('pyarrow')
+
+BATCH_SIZES = [1, 2, 3, 4, 100]
+
+
+def insert(user_class, values, field='a'):
+    user_class.collection.insert_many([{'i': i, field: value} if value is not None else {'i': i}
+                                       for i, value in enumerate(values)])
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_ints(user_class, batch_size):
+    insert(user_class, [0, 1, 2, 3, 4])
+    columns = user_class.to_columns(['a'], sort=[('i', 1)], batch_size=batch_size)
+    assert columns['a'].dtype == np.int64
+    assert columns['a'].tolist() == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_mixed_int_float(user_class, batch_size):
+    insert(user_class, [0, 1, 2, 3, 4, 2.5])
+    columns = user_class.to_columns(['a'], sort=[('i', 1)], batch_size=batch_size)
+    assert columns['a'].dtype == np.float64
+    assert columns['a'].tolist() == [0, 1, 2, 3, 4, 2.5]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_missing_values(user_class, batch_size):
+    insert(user_class, [None, None, 1, None, 3])
+    columns = user_class.to_columns(['a'], sort=[('i', 1)], batch_size=batch_size)
+    assert columns['a'].dtype == np.float64
+    assert np.isnan(columns['a'][[0, 1, 3]]).all()
+    assert columns['a'][[2, 4]].tolist() == [1, 3]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_all_missing(user_class, batch_size):
+    insert(user_class, [None, None, None])
+    columns = user_class.to_columns(['a'], batch_size=batch_size)
+    assert columns['a'].dtype == object
+    assert columns['a'].tolist() == [None, None, None]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_mixed_types_raise(user_class, batch_size):
+    insert(user_class, [0, 1, 2, 3, 4.0, 2.5, 'str'])
+    with pytest.raises(MongEasyFieldError):
+        user_class.to_columns(['a'], sort=[('i', 1)], batch_size=batch_size)
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_dtypes(user_class, batch_size):
+    insert(user_class, [0, 1, None, 3])
+    columns = user_class.to_columns(['a', 'i'], {'a': np.float32, 'i': np.int32}, sort=[('i', 1)], batch_size=batch_size)
+    assert columns['a'].dtype == np.float32
+    assert columns['i'].dtype == np.int32
+    assert columns['i'].tolist() == [0, 1, 2, 3]
+
+
+def test_numpy_dtype_rejects_lossy_values(user_class):
+    insert(user_class, [0, 2.5])
+    with pytest.raises(MongEasyFieldError):
+        user_class.to_columns(['a'], {'a': np.int64})
+    with pytest.raises(MongEasyFieldError):
+        user_class.to_columns(['i', 'b'], {'b': np.int64})
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_strings_datetimes_and_lists(user_class, batch_size):
+    _id = bson.ObjectId()
+    d = datetime.datetime(2023, 1, 2, 3, 4, 5)
+    user_class.collection.insert_many([
+        {'i': 0, 'name': 'Alice', 'd': d, 'tags': [1, 2, 3], 'ref': {'id': _id}},
+        {'i': 1, 'name': 'Bob', 'tags': [1]},
+        {'i': 2, 'd': d, 'tags': [_id, d]},
+    ])
+    columns = user_class.to_columns(['name', 'd', 'tags', 'ref.id'], sort=[('i', 1)], batch_size=batch_size)
+    assert columns['name'].tolist() == ['Alice', 'Bob', None]
+    assert columns['d'].dtype == np.dtype('datetime64[ms]')
+    assert np.isnat(columns['d'][1])
+    assert columns['tags'].tolist() == [[1, 2, 3], [1], [str(_id), d]]
+    assert columns['ref.id'].tolist() == [str(_id), None, None]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_arrow_inferred(user_class, batch_size):
+    insert(user_class, [None, None, 0, 1, 2, 3, 4, 2.5])
+    columns = user_class.to_columns(['a'], sort=[('i', 1)], backend='arrow', batch_size=batch_size)
+    assert columns['a'].type == pa.float64()
+    assert columns['a'].to_pylist() == [None, None, 0, 1, 2, 3, 4, 2.5]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_arrow_all_missing(user_class, batch_size):
+    insert(user_class, [None, None])
+    columns = user_class.to_columns(['a'], backend='arrow', batch_size=batch_size)
+    assert columns['a'].to_pylist() == [None, None]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_arrow_dtypes(user_class, batch_size):
+    insert(user_class, [0, None, 2])
+    columns = user_class.to_columns(['a'], {'a': pa.int32()}, sort=[('i', 1)], backend='arrow', batch_size=batch_size)
+    assert columns['a'].type == pa.int32()
+    assert columns['a'].to_pylist() == [0, None, 2]
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 100])
+def test_arrow_mixed_types_raise(user_class, batch_size):
+    insert(user_class, [0, 1, 'str'])
+    with pytest.raises(MongEasyFieldError):
+        user_class.to_columns(['a'], sort=[('i', 1)], backend='arrow', batch_size=batch_size)
+
+
+def test_arrow_nested_values(user_class):
+    _id = bson.ObjectId()
+    user_class.collection.insert_one({'tags': [_id], 'ref': {'id': _id}})
+    columns = user_class.to_columns(['tags', 'ref'], backend='arrow')
+    assert columns['tags'].to_pylist() == [[str(_id)]]
+    assert columns['ref'].to_pylist() == [{'id': str(_id)}]
+
+
+def test_arrow_nested_datetimes_stay_typed(user_class):
+    d = datetime.datetime(2023, 1, 2, 3, 4, 5)
+    user_class.collection.insert_one({'d': d, 'ref': {'d': d}, 'dates': [d]})
+    columns = user_class.to_columns(['d', 'ref', 'dates'], backend='arrow')
+    assert pa.types.is_timestamp(columns['d'].type)
+    assert pa.types.is_timestamp(columns['ref'].type.field('d').type)
+    assert pa.types.is_timestamp(columns['dates'].type.value_type)
+    assert columns['ref'].to_pylist() == [{'d': d}]
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_numpy_strings_mixed_with_lists(user_class, batch_size):
+    insert(user_class, ['a', [1, 2], {'b': 1}, None, 'c'])
+    columns = user_class.to_columns(['a'], sort=[('i', 1)], batch_size=batch_size)
+    assert columns['a'].dtype == object
+    assert columns['a'].tolist() == ['a', [1, 2], {'b': 1}, None, 'c']
+
+
+def test_empty_result(user_class):
+    assert user_class.to_columns(['a'])['a'].tolist() == []
+    assert user_class.to_columns(['a'], backend='arrow')['a'].to_pylist() == []
+
+
+def test_unknown_backend(user_class):
+    with pytest.raises(ValueError):
+        user_class.to_columns(['a'], backend='pandas')
+
+
+@pytest.mark.parametrize('batch_size', BATCH_SIZES)
+def test_resultlist_to_columns(user_class, batch_size):
+    insert(user_class, [0, 1, 2.5])
+    users = user_class.find({}, sort=[('i', 1)])
+    columns = users.to_columns(['i', 'a'], batch_size=batch_size)
+    assert columns['i'].tolist() == [0, 1, 2]
+    assert columns['a'].dtype == np.float64
+    assert columns['a'].tolist() == [0, 1, 2.5]
+
+
+def test_resultlist_to_columns_dicts_and_invalid_items():
+    assert ResultList([{'a': 1}, {'a': 2}]).to_columns(['a'])['a'].tolist() == [1, 2]
+    with pytest.raises(TypeError):
+        ResultList([1, 2]).to_columns(['a'])
@@ -0,0 +1,140 @@
+import datetime
+import logging
+
+import bson
+import pytest
+from bson import json_util
+
+from mongeasy.tools.columnar import DATETIME_FORMAT
+
+
+def test_insert_many_counts(user_class):
+    assert user_class.insert_many(({'n': i} for i in range(10)), batch_size=3) == 10
+    assert user_class.document_count() == 10
+
+
+def test_insert_many_accepts_documents(user_class):
+    assert user_class.insert_many([user_class(n=1), {'n': 2}]) == 2
+    assert sorted(doc['n'] for doc in user_class.collection.find()) == [1, 2]
+
+
+def test_insert_many_updates_existing_ids(user_class):
+    _id = bson.ObjectId()
+    user_class.collection.insert_one({'_id': _id, 'n': 1, 'keep': True})
+    new_id = bson.ObjectId()
+    assert user_class.insert_many([{'_id': str(_id), 'n': 2}, {'_id': new_id, 'n': 3}]) == 2
+    assert user_class.collection.find_one({'_id': _id}) == {'_id': _id, 'n': 2, 'keep': True}
+    assert user_class.collection.find_one({'_id': new_id}) == {'_id': new_id, 'n': 3}
+
+
+def test_insert_many_skips_invalid_and_duplicate_ids(user_class, caplog):
+    new_id = bson.ObjectId()
+    docs = [{'n': 1}, {'_id': new_id, 'n': 2}, {'_id': 'invalid'}, {'_id': str(new_id), 'n': 3}, {'n': 4}]
+    with caplog.at_level(logging.ERROR):
+        assert user_class.insert_many(docs, batch_size=5) == 3
+    assert user_class.document_count() == 3
+    assert 'invalid' in caplog.text
+    assert 'E11000' in caplog.text
+    assert docs[3] == {'_id': str(new_id), 'n': 3}
+
+
+def test_insert_many_connects_collection(db, monkeypatch):
+    import mongeasy
+    from mongeasy.models.document import Document
+
+    class Book(Document):
+        pass
+
+    monkeypatch.setattr(mongeasy, 'connection', db)
+    assert Book.insert_many([{'title': 'Dune'}]) == 1
+    assert db['books'].count_documents({}) == 1
+
+
+def make_docs(user_class):
+    d = datetime.datetime(2023, 1, 2, 3, 4, 5, 123000)
+    ref = bson.ObjectId()
+    user_class.collection.insert_many([
+        {'name': 'Alice', 'age': 30, 'd': d, 'address': {'city': 'Anytown', 'ref': ref}, 'tags': [ref, 1]},
+        {'name': 'Bob', 'age': 31, 'price': bson.Decimal128('1.5'), 'views': bson.Int64(5)},
+    ])
+    return d, ref
+
+
+def test_ndjson_round_trip(user_class, copy_class, tmp_path):
+    make_docs(user_class)
+    path = tmp_path / 'users.ndjson'
+    assert user_class.export_ndjson(str(path), batch_size=1) == 2
+    assert copy_class.import_ndjson(str(path)) == 2
+    originals = list(user_class.collection.find(sort=[('name', 1)]))
+    copies = list(copy_class.collection.find(sort=[('name', 1)]))
+    assert copies == originals
+    assert isinstance(copies[0]['d'], datetime.datetime)
+    assert isinstance(copies[0]['address']['ref'], bson.ObjectId)
+    assert isinstance(copies[1]['views'], bson.Int64)
+
+
+def test_ndjson_export_filter(user_class, tmp_path):
+    make_docs(user_class)
+    path = tmp_path / 'users.ndjson'
+    assert user_class.export_ndjson(str(path), {'age': {'$gt': 30}}) == 1
+    assert json_util.loads(path.read_text())['name'] == 'Bob'
+
+
+def test_csv_round_trip(user_class, copy_class, tmp_path):
+    d, ref = make_docs(user_class)
+    path = tmp_path / 'users.csv'
+    fields = ['name', 'age', 'd', 'address.city', 'address.ref', 'tags', 'price']
+    assert user_class.export_csv(str(path), fields, batch_size=1) == 2
+    converters = {
+        'age': int,
+        'd': lambda s: datetime.datetime.strptime(s, DATETIME_FORMAT),
+        'address.ref': bson.ObjectId,
+        'tags': json_util.loads,
+        'price': bson.Decimal128,
+    }
+    assert copy_class.import_csv(str(path), converters) == 2
+    alice = copy_class.collection.find_one({'name': 'Alice'})
+    assert alice['age'] == 30
+    assert alice['d'] == d
+    assert alice['address'] == {'city': 'Anytown', 'ref': ref}
+    assert alice['tags'] == [ref, 1]
+    bob = copy_class.collection.find_one({'name': 'Bob'})
+    assert bob['price'] == bson.Decimal128('1.5')
+    assert 'd' not in bob
+
+
+def test_failed_open_keeps_existing_file(user_class, tmp_path, monkeypatch):
+    make_docs(user_class)
+    path = tmp_path / 'keep.csv'
+    path.write_text('existing')
+    real_open = open
+
+    def fail_open(file, *args, **kwargs):
+        if str(file) == str(path):
+            raise PermissionError(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', fail_open)
+    with pytest.raises(PermissionError):
+        user_class.export_csv(str(path), ['name'])
+    monkeypatch.undo()
+    assert path.read_text() == 'existing'
+
+
+def test_failed_export_removes_file(user_class, tmp_path, monkeypatch):
+    make_docs(user_class)
+    path = tmp_path / 'users.ndjson'
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('lost connection')
+
+    monkeypatch.setattr(json_util, 'dumps', fail)
+    with pytest.raises(RuntimeError):
+        user_class.export_ndjson(str(path))
+    assert not path.exists()
+
+
+def test_to_dict_converts_values(user_class):
+    d = datetime.datetime(2023, 1, 2)
+    user = user_class(_id=bson.ObjectId(), d=d)
+    assert user.to_dict() == {'_id': str(user._id), 'd': d.strftime(DATETIME_FORMAT)}